@@ -3,6 +3,7 @@ import math
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
+import json
 import os
 import shutil
 from typing import Dict
@@ -10,6 +11,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
+from utils.skeleton import build_humanoid_skeleton, skeleton_to_preview
 
 ######## type ########
 
@@ -31,11 +33,14 @@ load_dotenv()
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+MESH_CACHE_DIR = os.getenv("MESH_CACHE_DIR", os.path.join(UPLOAD_DIR, "mesh_cache"))
+
 ######## global variables ########
 
 # queue & task
 task_queue = asyncio.Queue()
 task_progress: Dict[str, str] = {} # [task_id, queued | processing | done]
+task_skeleton: Dict[str, dict] = {} # [task_id, skeleton preview], set once RigNet finishes
 
 ######## worker ########
 
@@ -55,10 +60,20 @@ async def handle_rigging(task):
             pass
 
     progress_task = asyncio.create_task(update_progress_loop())
+    cache_proc = None
 
     try:
-        # Copy obj file to rig
         src = os.path.join(UPLOAD_DIR, f"{task.id}_mesh.obj")
+
+        # Parse obj once into the binary mesh cache, alongside rigging
+        cache_proc = await asyncio.create_subprocess_exec(
+            "/usr/local/bin/python", "utils/mesh_cache.py", src, MESH_CACHE_DIR,
+            cwd="/app",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        # Copy obj file to rig
         dst = os.path.join("/workspace/RigNet/quick_start", f"{task.id}_ori.obj")
         shutil.copyfile(src, dst)
 
@@ -84,9 +99,22 @@ async def handle_rigging(task):
         rig_txt_dst = os.path.join(UPLOAD_DIR, f"{task.id}_ori_rig.txt")
         shutil.copyfile(rig_txt_src, rig_txt_dst)
 
+        # Publish the skeleton preview before the blender stage
+        try:
+            joint_pos, joint_hier, root_name = build_humanoid_skeleton(rig_txt_dst)
+            task_skeleton[task.id] = skeleton_to_preview(joint_pos, joint_hier, root_name)
+        except Exception as e:
+            print(f"[{task.id}] skeleton preview error: {e}")
+
+        # Blender falls back to the obj when the cache could not be built
+        c_stdout, c_stderr = await cache_proc.communicate()
+        mesh_cache_dir = c_stdout.decode().strip() if cache_proc.returncode == 0 else ""
+        if not mesh_cache_dir:
+            print(f"[{task.id}] mesh cache error:\n{c_stderr.decode()}")
+
         # Combind obj and rig result
         blender_proc = await asyncio.create_subprocess_exec(
-            "/blender/blender", "--background", "--python", "utils/blender_save_fbx.py", "--", "uploads", task.id,
+            "/blender/blender", "--background", "--python", "utils/blender_save_fbx.py", "--", "uploads", task.id, mesh_cache_dir,
             cwd="/app",
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
@@ -104,6 +132,11 @@ async def handle_rigging(task):
         print(f"[{task.id}] Exception: {e}")
 
     finally:
+        # Don't leave the cache builder running or undrained when rigging bailed out early
+        if cache_proc is not None:
+            if cache_proc.returncode is None:
+                cache_proc.kill()
+            await cache_proc.communicate()
         done_event.set()
         await progress_task
 
@@ -205,11 +238,16 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     try:
         task_id = await websocket.receive_text()
+        skeleton_sent = False
 
         while True:
             await asyncio.sleep(0.01)
             status = task_progress.get(task_id, "unknown")
 
+            if not skeleton_sent and task_id in task_skeleton:
+                await websocket.send_text(f"skeleton: {json.dumps(task_skeleton[task_id], separators=(',', ':'))}")
+                skeleton_sent = True
+
             await websocket.send_text(f"status: {status}")
 
             if status == "done" or status.startswith("error"):
@@ -218,6 +256,17 @@ async def websocket_endpoint(websocket: WebSocket):
     finally:
         await websocket.close()
 
+@app.get("/rigging/skeleton")
+async def get_skeleton_preview(task_id: str):
+    skeleton = task_skeleton.get(task_id)
+    if skeleton is None:
+        status = task_progress.get(task_id, "unknown")
+        if status == "done" or status.startswith("error") or status == "unknown":
+            raise HTTPException(status_code=404, detail="Skeleton not found")
+        raise HTTPException(status_code=400, detail="Skeleton not ready")
+
+    return skeleton
+
 @app.get("/rigging")
 async def get_image_result(task_id: str):
     if task_progress.get(task_id) != "done":
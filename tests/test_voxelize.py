@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from utils.voxelize import surface_voxels, triangulate, voxelize, write_binvox
+
+def read_binvox(path):
+    # Decoding copied from RigNet's binvox_rw.read_as_3d_array
+    with open(path, 'rb') as fp:
+        line = fp.readline().strip()
+        assert line.startswith(b'#binvox')
+        dims = list(map(int, fp.readline().strip().split(b' ')[1:]))
+        translate = list(map(float, fp.readline().strip().split(b' ')[1:]))
+        scale = list(map(float, fp.readline().strip().split(b' ')[1:]))[0]
+        fp.readline()
+        raw_data = np.frombuffer(fp.read(), dtype=np.uint8)
+    values, counts = raw_data[::2], raw_data[1::2]
+    data = np.repeat(values, counts).astype(bool)
+    data = data.reshape(dims)
+    data = np.transpose(data, (0, 2, 1))
+    return data, translate, scale
+
+def box_mesh(size):
+    vertices = np.array([
+        [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+        [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+    ], dtype=np.float64) * size
+    face_sizes = np.full(6, 4)
+    face_vertices = np.array([
+        0, 3, 2, 1,  4, 5, 6, 7,  0, 1, 5, 4,
+        1, 2, 6, 5,  2, 3, 7, 6,  3, 0, 4, 7,
+    ])
+    return vertices, triangulate(face_sizes, face_vertices)
+
+def uv_sphere(n_lon=64, n_lat=32):
+    theta = np.linspace(0, np.pi, n_lat + 1)[1:-1]
+    phi = np.linspace(0, 2 * np.pi, n_lon, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    ring = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1).reshape(-1, 3)
+    vertices = np.concatenate([[[0, 0, 1]], ring, [[0, 0, -1]]])
+
+    j = np.arange(n_lon)
+    jn = (j + 1) % n_lon
+    bottom = len(vertices) - 1
+    last_ring = 1 + (n_lat - 2) * n_lon
+    faces = [np.stack([np.zeros(n_lon, dtype=int), 1 + j, 1 + jn], axis=1)]
+    for i in range(n_lat - 2):
+        a, b = 1 + i * n_lon + j, 1 + i * n_lon + jn
+        faces += [np.stack([a, a + n_lon, b + n_lon], axis=1), np.stack([a, b + n_lon, b], axis=1)]
+    faces.append(np.stack([np.full(n_lon, bottom), last_ring + jn, last_ring + j], axis=1))
+    return vertices, np.concatenate(faces)
+
+def test_box_occupancy():
+    # 16 x 8.25 x 4.25 voxels: faces sit inside the last voxel layer, not on a boundary
+    vertices, triangles = box_mesh(np.array([1.0, 8.25 / 16, 4.25 / 16]))
+    voxels, translate, scale = voxelize(vertices, triangles, 16)
+
+    expected = np.zeros((16, 16, 16), dtype=bool)
+    expected[:, :9, :5] = True
+    assert np.array_equal(voxels, expected)
+    assert np.allclose(translate, 0)
+    assert scale == 1.0
+
+@pytest.mark.parametrize("dim", [32, 88])
+def test_sphere_matches_analytic_ball(dim):
+    vertices, triangles = uv_sphere()
+    voxels, translate, scale = voxelize(vertices, triangles, dim)
+
+    centers = (np.arange(dim) + 0.5) / dim * scale + translate[0]
+    x, y, z = np.meshgrid(centers, centers, centers, indexing='ij')
+    radius = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    ball = radius <= 1
+
+    # Every voxel center inside the ball is filled; extra voxels are surface ones
+    assert not (ball & ~voxels).any()
+    extra = voxels & ~ball
+    assert np.all(radius[extra] - 1 <= np.sqrt(3) / 2 * scale / dim)
+
+def test_surface_voxels_cover_dense_samples():
+    # Reference grid: voxels hit by a 200 x 200 barycentric sampling of each triangle
+    rng = np.random.default_rng(0)
+    dim = 32
+    tri = rng.uniform(0, dim, (200, 3, 3)) * rng.uniform(0.02, 0.3, (200, 1, 1)) + rng.uniform(0, dim * 0.6, (200, 1, 3))
+
+    n = 200
+    i, j = np.nonzero(np.add.outer(np.arange(n + 1), np.arange(n + 1)) <= n)
+    bary = np.stack([1 - (i + j) / n, i / n, j / n], axis=1)
+    pts = np.einsum('pk,fkc->fpc', bary, tri).reshape(-1, 3)
+    idx = np.clip(np.floor(pts).astype(np.int64), 0, dim - 1)
+    reference = np.zeros((dim, dim, dim), dtype=bool)
+    reference[idx[:, 0], idx[:, 1], idx[:, 2]] = True
+
+    occ = surface_voxels(tri, dim, max_pairs=4096)
+    assert not (reference & ~occ).any()
+    assert np.array_equal(occ, surface_voxels(tri, dim))
+
+def test_write_binvox_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    voxels = rng.random((40, 40, 40)) < 0.3
+    # Runs longer than 255 must be split across several count bytes
+    voxels[5:20] = True
+    voxels[30:] = False
+
+    path = tmp_path / "mesh.binvox"
+    write_binvox(path, voxels, np.array([-0.5, 0.25, 1.0]), 2.5)
+    data, translate, scale = read_binvox(path)
+
+    assert np.array_equal(data, voxels)
+    assert translate == [-0.5, 0.25, 1.0]
+    assert scale == 2.5
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+# Bump whenever ARRAY_NAMES or the parser output changes, so old cache
+# directories are not picked up as hits.
+CACHE_FORMAT_VERSION = 1
+
+# Arrays stored per mesh. Faces are kept as polygons (flat per-loop index
+# arrays + face sizes) so consumers see the same topology as the OBJ.
+ARRAY_NAMES = (
+    "vertices",          # (V, 3) float32
+    "uvs",               # (T, 2) float32
+    "normals",           # (N, 3) float32
+    "face_sizes",        # (F,)   int32
+    "face_vertices",     # (L,)   int32, L = face_sizes.sum()
+    "face_uvs",          # (L,)   int32, empty if the OBJ has no complete UVs
+    "face_normals",      # (L,)   int32, empty if the OBJ has no complete normals
+    "face_materials",    # (F,)   int32, index into the material arrays, -1 before any usemtl
+    "material_names",    # (M,)   str, in order of first usemtl
+    "material_colors",   # (M, 3) float32, MTL Kd
+    "material_textures", # (M,)   str, absolute MTL map_Kd path, "" if none
+)
+
+def parse_mtl(mtl_path):
+    """Diffuse color and texture per material; other MTL properties are not kept."""
+    materials = {}
+    current = None
+    with open(mtl_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == 'newmtl':
+                current = materials.setdefault(line.split(None, 1)[1].strip(), {})
+            elif current is not None and parts[0] == 'Kd':
+                current['Kd'] = [float(x) for x in parts[1:4]]
+            elif current is not None and parts[0] == 'map_Kd':
+                # Texture options come before the file name
+                current['map_Kd'] = os.path.abspath(os.path.join(os.path.dirname(mtl_path), parts[-1]))
+    return materials
+
+def mtl_paths(obj_path):
+    paths = []
+    with open(obj_path, 'r') as f:
+        for line in f:
+            if line.startswith('mtllib '):
+                paths.append(os.path.join(os.path.dirname(obj_path), line.split(None, 1)[1].strip()))
+    return paths
+
+def content_hash(paths, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+def parse_obj(obj_path):
+    positions, uvs, normals = [], [], []
+    face_sizes, face_v, face_vt, face_vn = [], [], [], []
+    missing_vt = missing_vn = False
+    mtl_materials, face_materials, material_index = {}, [], {}
+    current_material = -1
+
+    def resolve(token, count):
+        # OBJ indices are 1-based; negative ones are relative to the current end
+        i = int(token)
+        index = i - 1 if i > 0 else count + i
+        if i == 0 or not 0 <= index < count:
+            raise ValueError(f"OBJ index {i} out of range for {count} elements: {obj_path}")
+        return index
+
+    with open(obj_path, 'r') as f:
+        for line in f:
+            if line.startswith('v '):
+                positions.append(line[2:].split()[:3])
+            elif line.startswith('vt '):
+                uvs.append(line[3:].split()[:2])
+            elif line.startswith('vn '):
+                normals.append(line[3:].split()[:3])
+            elif line.startswith('mtllib '):
+                mtl_path = os.path.join(os.path.dirname(obj_path), line.split(None, 1)[1].strip())
+                if os.path.isfile(mtl_path):
+                    mtl_materials.update(parse_mtl(mtl_path))
+            elif line.startswith('usemtl '):
+                current_material = material_index.setdefault(line.split(None, 1)[1].strip(), len(material_index))
+            elif line.startswith('f '):
+                corners = line[2:].split()
+                face_sizes.append(len(corners))
+                face_materials.append(current_material)
+                for corner in corners:
+                    parts = corner.split('/')
+                    face_v.append(resolve(parts[0], len(positions)))
+                    if len(parts) > 1 and parts[1]:
+                        face_vt.append(resolve(parts[1], len(uvs)))
+                    else:
+                        missing_vt = True
+                    if len(parts) > 2 and parts[2]:
+                        face_vn.append(resolve(parts[2], len(normals)))
+                    else:
+                        missing_vn = True
+
+    return {
+        "vertices": np.array(positions, dtype=np.float32).reshape(-1, 3),
+        "uvs": np.array(uvs, dtype=np.float32).reshape(-1, 2),
+        "normals": np.array(normals, dtype=np.float32).reshape(-1, 3),
+        "face_sizes": np.array(face_sizes, dtype=np.int32),
+        "face_vertices": np.array(face_v, dtype=np.int32),
+        "face_uvs": np.array([] if missing_vt else face_vt, dtype=np.int32),
+        "face_normals": np.array([] if missing_vn else face_vn, dtype=np.int32),
+        "face_materials": np.array(face_materials, dtype=np.int32),
+        "material_names": np.array(list(material_index), dtype=str),
+        "material_colors": np.array(
+            [mtl_materials.get(name, {}).get('Kd', [0.8, 0.8, 0.8]) for name in material_index],
+            dtype=np.float32).reshape(-1, 3),
+        "material_textures": np.array(
+            [mtl_materials.get(name, {}).get('map_Kd', '') for name in material_index], dtype=str),
+    }
+
+def build_mesh_cache(obj_path, cache_root):
+    """Parse obj_path once into cache_root/v<version>-<sha256>/ and return that directory.
+
+    The hash covers the OBJ and the MTL files it references. The directory
+    is only published after every array is written, so an existing
+    directory is always a complete cache hit.
+    """
+    key = content_hash([obj_path] + mtl_paths(obj_path))
+    cache_dir = os.path.join(cache_root, f"v{CACHE_FORMAT_VERSION}-{key}")
+    if os.path.isdir(cache_dir):
+        return cache_dir
+
+    arrays = parse_obj(obj_path)
+
+    os.makedirs(cache_root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_root, prefix='.tmp-')
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        try:
+            os.rename(tmp_dir, cache_dir)
+        except OSError:
+            # Another worker published the same mesh first
+            if not os.path.isdir(cache_dir):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return cache_dir
+
+def load_mesh_cache(cache_dir):
+    """Memory-map the cached arrays; nothing is read until it is accessed."""
+    return {
+        name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r')
+        for name in ARRAY_NAMES
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python mesh_cache.py <OBJ_PATH> <CACHE_ROOT>")
+        sys.exit(1)
+    print(build_mesh_cache(sys.argv[1], sys.argv[2]))
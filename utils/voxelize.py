@@ -0,0 +1,160 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mesh_cache import parse_obj
+
+# Offset of the ray origins from voxel centers, so rays don't graze shared
+# edges and vertices of regularly spaced meshes and get counted twice.
+RAY_JITTER = (1.234e-4, 2.718e-4)
+
+def triangulate(face_sizes, face_vertices):
+    # Fan triangulation: (v0, v1, v2), (v0, v2, v3), ...
+    starts = np.concatenate([[0], np.cumsum(face_sizes)[:-1]])
+    tris_per_face = np.maximum(face_sizes - 2, 0)
+    first = np.repeat(starts, tris_per_face)
+    offset = np.arange(tris_per_face.sum()) - np.repeat(np.cumsum(tris_per_face) - tris_per_face, tris_per_face)
+    return np.stack([
+        face_vertices[first],
+        face_vertices[first + offset + 1],
+        face_vertices[first + offset + 2],
+    ], axis=1)
+
+def surface_voxels(tri, dim, max_pairs=1 << 18):
+    """Mark every voxel whose closed cube overlaps a triangle.
+
+    Separating axis test (box normals, triangle normal, and the nine edge x
+    box-normal cross products) against each voxel in the triangle's bounding
+    box, in chunks of at most max_pairs triangle/voxel pairs.
+    """
+    occ = np.zeros((dim, dim, dim), dtype=bool)
+    lo = np.clip(np.floor(tri.min(axis=1)).astype(np.int64), 0, dim - 1)
+    hi = np.clip(np.floor(tri.max(axis=1)).astype(np.int64), 0, dim - 1)
+    size = hi - lo + 1
+    counts = size.prod(axis=1)
+
+    # Split triangles into runs of about max_pairs candidate voxels
+    cum = np.cumsum(counts)
+    splits = np.searchsorted(cum, np.arange(max_pairs, cum[-1] if len(cum) else 0, max_pairs), side='right')
+    bounds = np.unique(np.concatenate([[0], splits, [len(tri)]]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        c = counts[start:end]
+        t = np.repeat(np.arange(start, end), c)
+        local = np.arange(c.sum()) - np.repeat(np.cumsum(c) - c, c)
+        ny, nz = size[t, 1], size[t, 2]
+        idx = lo[t] + np.stack([local // (ny * nz), (local // nz) % ny, local % nz], axis=1)
+
+        # Triangle in voxel-centered coordinates; the voxel is [-0.5, 0.5]^3
+        v = tri[t] - (idx + 0.5)[:, None, :]
+        e = np.roll(v, -1, axis=1) - v
+
+        # Triangle plane
+        n = np.cross(e[:, 0], e[:, 1])
+        overlap = np.abs(np.einsum('pc,pc->p', n, v[:, 0])) <= 0.5 * np.abs(n).sum(axis=1) + 1e-9
+
+        # Edge x box-normal axes
+        axes = np.cross(e[:, :, None, :], np.eye(3)[None, None])
+        proj = np.einsum('pijc,pkc->pijk', axes, v)
+        radius = 0.5 * np.abs(axes).sum(axis=3) + 1e-9
+        overlap &= ((proj.min(axis=3) <= radius) & (proj.max(axis=3) >= -radius)).all(axis=(1, 2))
+
+        # Box normals are covered by the bounding-box candidate range
+        hit = idx[overlap]
+        occ[hit[:, 0], hit[:, 1], hit[:, 2]] = True
+    return occ
+
+def parity_fill(tri, dim):
+    """Interior voxels from ray parity along +z through every (x, y) column."""
+    a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+    v0, v1 = b - a, c - a
+    det = v0[:, 0] * v1[:, 1] - v0[:, 1] * v1[:, 0]
+
+    # Candidate columns per triangle from its xy bounding box
+    lo = np.ceil(tri[:, :, :2].min(axis=1) - 0.5 - np.array(RAY_JITTER)).astype(np.int64)
+    hi = np.floor(tri[:, :, :2].max(axis=1) - 0.5 - np.array(RAY_JITTER)).astype(np.int64)
+    lo, hi = np.clip(lo, 0, dim - 1), np.clip(hi, 0, dim - 1)
+    nx, ny = hi[:, 0] - lo[:, 0] + 1, hi[:, 1] - lo[:, 1] + 1
+    counts = np.where(det != 0, np.maximum(nx, 0) * np.maximum(ny, 0), 0)
+
+    t = np.repeat(np.arange(len(tri)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    ix = lo[t, 0] + local // ny[t]
+    iy = lo[t, 1] + local % ny[t]
+
+    px = ix + 0.5 + RAY_JITTER[0] - a[t, 0]
+    py = iy + 0.5 + RAY_JITTER[1] - a[t, 1]
+    u = (px * v1[t, 1] - py * v1[t, 0]) / det[t]
+    v = (v0[t, 0] * py - v0[t, 1] * px) / det[t]
+    hit = (u >= 0) & (v >= 0) & (u + v <= 1)
+
+    t, ix, iy, u, v = t[hit], ix[hit], iy[hit], u[hit], v[hit]
+    z = a[t, 2] + u * v0[t, 2] + v * v1[t, 2]
+
+    # Each crossing flips the state of every voxel center above it
+    k = np.clip(np.floor(z + 0.5).astype(np.int64), 0, dim)
+    flat = (ix * dim + iy) * (dim + 1) + k
+    crossings = np.bincount(flat, minlength=dim * dim * (dim + 1)).reshape(dim, dim, dim + 1)
+    return (np.cumsum(crossings, axis=2)[:, :, :dim] % 2).astype(bool)
+
+def voxelize(vertices, triangles, dim):
+    """Solid occupancy grid over the mesh's cubic bounding box, like binvox.
+
+    Interior fill takes a majority vote of the parity along x, y and z, so a
+    small hole in the surface doesn't leak a streak through the volume.
+    Returns (voxels[x, y, z], translate, scale).
+    """
+    translate = vertices.min(axis=0)
+    scale = float((vertices.max(axis=0) - translate).max())
+    tri = ((vertices - translate) / scale * dim)[triangles]
+
+    votes = np.zeros((dim, dim, dim), dtype=np.int8)
+    for axis in range(3):
+        order = [(axis + 1) % 3, (axis + 2) % 3, axis]
+        votes += np.moveaxis(parity_fill(tri[:, :, order], dim), [0, 1, 2], order)
+
+    return surface_voxels(tri, dim) | (votes >= 2), translate, scale
+
+def write_binvox(path, voxels, translate, scale):
+    """Write voxels[x, y, z] in the format read by binvox_rw.read_as_3d_array."""
+    dim = voxels.shape[0]
+    # binvox stores x-major, then z, with y running fastest
+    flat = np.transpose(voxels, (0, 2, 1)).ravel().astype(np.uint8)
+
+    starts = np.concatenate([[0], np.flatnonzero(flat[1:] != flat[:-1]) + 1])
+    lengths = np.diff(np.concatenate([starts, [flat.size]]))
+
+    # Run lengths are stored in a single byte
+    chunks = (lengths + 254) // 255
+    counts = np.full(chunks.sum(), 255, dtype=np.int64)
+    counts[np.cumsum(chunks) - 1] = lengths - 255 * (chunks - 1)
+    values = np.repeat(flat[starts], chunks)
+
+    with open(path, 'wb') as f:
+        f.write(b'#binvox 1\n')
+        f.write(f"dim {dim} {dim} {dim}\n".encode())
+        f.write(f"translate {translate[0]} {translate[1]} {translate[2]}\n".encode())
+        f.write(f"scale {scale}\n".encode())
+        f.write(b'data\n')
+        f.write(np.stack([values, counts], axis=1).astype(np.uint8).tobytes())
+
+def main():
+    # Drop-in for `binvox -d <dim> <mesh.obj>`, which writes <mesh>.binvox
+    parser = argparse.ArgumentParser(description="CPU voxelizer producing .binvox files")
+    parser.add_argument("-d", type=int, default=256, dest="dim")
+    parser.add_argument("obj_path")
+    args = parser.parse_args()
+
+    mesh = parse_obj(args.obj_path)
+    vertices = mesh["vertices"].astype(np.float64)
+    triangles = triangulate(mesh["face_sizes"], mesh["face_vertices"])
+
+    voxels, translate, scale = voxelize(vertices, triangles, args.dim)
+    out_path = os.path.splitext(args.obj_path)[0] + ".binvox"
+    write_binvox(out_path, voxels, translate, scale)
+    print(f"Wrote {out_path} ({int(voxels.sum())} of {voxels.size} voxels filled)")
+
+if __name__ == "__main__":
+    main()